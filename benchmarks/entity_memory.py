@@ -0,0 +1,116 @@
+import os
+import sys
+import gc
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from scripts.utils import load_images, Animation
+from scripts.entities import Enemy
+
+COUNT = 10000
+FLIPS = 100000
+
+class LegacyAnimation:
+    # the animation as it was before clips were shared: frame state lives on a copy per entity
+    def __init__(self, images, img_dur = 5, loop = True):
+        self.images = images
+        self.loop = loop
+        self.img_duration = img_dur
+        self.done = False
+        self.frame = 0
+
+    def copy(self):
+        return LegacyAnimation(self.images, self.img_duration, self.loop)
+
+class LegacyEnemy:
+    # the entity layout before __slots__ and collision flags, reduced to what construction touches
+    def __init__(self, game, pos, size):
+        self.game = game
+        self.type = 'enemy'
+        self.pos = list(pos)
+        self.size = size
+        self.velocity = [0, 0]
+        self.collisions = {'up': False, 'down': False, 'right': False, 'left': False}
+
+        self.action = ''
+        self.anim_offset = (-1, -1)
+        self.flip = False
+        self.set_action('idle')
+
+        self.walking = 0
+        self.idle = int(random.expovariate(0.01))
+
+    def set_action(self, action):
+        if action != self.action:
+            self.action = action
+            self.animation = self.game.assets[self.type + '/' + self.action].copy()
+
+class Assets:
+    def __init__(self):
+        self.assets = {
+            'enemy/idle': LegacyAnimation(load_images('entities/enemy/idle'), img_dur = 12),
+            'enemy/run': LegacyAnimation(load_images('entities/enemy/run'), img_dur = 12),
+        }
+        self.clips = {
+            'enemy': {
+                'idle': Animation(load_images('entities/enemy/idle'), img_dur = 12),
+                'run': Animation(load_images('entities/enemy/run'), img_dur = 12),
+            }
+        }
+
+def measure_entities(game, entity):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    enemies = [entity(game, (i * 16, 0), (16, 16)) for i in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding them is not part of the entity
+    return (after - before - sys.getsizeof(enemies)) / COUNT, enemies
+
+def traced_peak(set_action):
+    gc.collect()
+    tracemalloc.start()
+    for i in range(FLIPS):
+        set_action('run' if i % 2 else 'idle')
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def measure_action_changes(enemy):
+    start = time.perf_counter()
+    for i in range(FLIPS):
+        enemy.set_action('run' if i % 2 else 'idle')
+    duration = time.perf_counter() - start
+
+    # the loop itself allocates a little (ints from range), so report only what set_action adds
+    peak = traced_peak(enemy.set_action) - traced_peak(lambda action: None)
+    return max(0, peak), duration / FLIPS * 1e9
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    game = Assets()
+    rows = []
+    for name, entity in (('legacy', LegacyEnemy), ('current', Enemy)):
+        per_entity, enemies = measure_entities(game, entity)
+        peak, per_change = measure_action_changes(enemies[0])
+        rows.append((name, per_entity, peak, per_change))
+        del enemies
+
+    print(format('', '24') + ''.join(format(row[0], '>10') for row in rows))
+    print(format('bytes per enemy', '24') + ''.join(format(row[1], '>10.0f') for row in rows))
+    print(format('set_action peak bytes', '24') + ''.join(format(row[2], '>10') for row in rows))
+    print(format('set_action time (ns)', '24') + ''.join(format(row[3], '>10.0f') for row in rows))
+    print(str(COUNT) + ' enemies, ' + str(FLIPS) + ' action changes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 10
+
+# runs in a fresh interpreter each time so import cost is not cached
+PROBE = '''
+import json
+import time
+start = time.perf_counter()
+import game
+imported = time.perf_counter()
+g = game.Game()
+g.display_2.blit(g.assets['start_screen'], (0, 0))
+g.screen.blit(g.get_letterbox(g.display_2), (0, 0))
+first_frame = time.perf_counter()
+g.load()
+loaded = time.perf_counter()
+print(json.dumps([imported - start, first_frame - start, loaded - first_frame]))
+'''
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+def main():
+    env = dict(os.environ, SDL_VIDEODRIVER = 'dummy', SDL_AUDIODRIVER = 'dummy', PYGAME_HIDE_SUPPORT_PROMPT = '1')
+    samples = []
+    for i in range(RUNS):
+        out = subprocess.run([sys.executable, '-c', PROBE], cwd = ROOT, env = env, capture_output = True, text = True, check = True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print('import game:          ' + format(median([s[0] for s in samples]) * 1000, '.1f') + ' ms')
+    print('time to first frame:  ' + format(median([s[1] for s in samples]) * 1000, '.1f') + ' ms')
+    print('background load:      ' + format(median([s[2] for s in samples]) * 1000, '.1f') + ' ms')
+
+if __name__ == '__main__':
+    main()
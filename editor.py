@@ -143,4 +143,8 @@ class Editor:
             pygame.display.update()
             self.clock.tick(60)
 
-Editor().run()
\ No newline at end of file
+def main():
+    Editor().run()
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,22 @@ import sys
 import pygame
 import random
 import os
+import threading
 
 from scripts.utils import load_image, load_images, Animation
 from scripts.entities import PhysicsEntity, Player, Enemy
 from scripts.tilemap import Tilemap
-from scripts.clouds import Clouds
+from scripts.clouds import Clouds, ParallaxLayer
+from scripts.navigation import Navigation
+from scripts.activity import Activity
+from scripts.audio import Audio
+from scripts.snapshot import Snapshot
 
 class Game:
     def __init__(self):
-        pygame.init()
+        # only what the start screen needs; everything else is set up by load()
+        pygame.display.init()
+        pygame.font.init()
         pygame.display.set_caption('Grims Adventure')
         info = pygame.display.Info()
         self.native_size = (info.current_w, info.current_h)
@@ -21,55 +28,67 @@ class Game:
         self.movement = [False, False]
 
         self.assets = {
+            'start_screen': load_image('start_screen.png')
+        }
+
+        self.paused = False
+        self.load_error = None
+
+    def load_in_background(self):
+        # exceptions don't cross threads, so keep it for run() to re-raise
+        try:
+            self.load()
+        except Exception as e:
+            self.load_error = e
+
+    def load(self):
+        pygame.mixer.init()
+
+        self.assets.update({
             'decor': load_images('tiles/decor'),
             'grass': load_images('tiles/grass'),
             'large_decor': load_images('tiles/large_decor'),
             'stone': load_images('tiles/stone'),
             'player': load_image('entities/player.png'),
             'background': load_image('background.png'),
-            'start_screen': load_image('start_screen.png'),
             'victory_screen': load_image('victory_screen.png'),
             'clouds': load_images('clouds'),
-            'enemy/idle': Animation(load_images('entities/enemy/idle'), img_dur = 12),
-            'enemy/run': Animation(load_images('entities/enemy/run'), img_dur = 12),
-            'player/idle': Animation(load_images('entities/player/idle'), img_dur = 16),
-            'player/run': Animation(load_images('entities/player/run'), img_dur = 6),
-            'player/jump': Animation(load_images('entities/player/jump')),
             'projectile': load_image('projectile.png'),
             'player/attack': load_image('attack.png')
+        })
+
+        self.clips = {
+            'enemy': {
+                'idle': Animation(load_images('entities/enemy/idle'), img_dur = 12),
+                'run': Animation(load_images('entities/enemy/run'), img_dur = 12),
+            },
+            'player': {
+                'idle': Animation(load_images('entities/player/idle'), img_dur = 16),
+                'run': Animation(load_images('entities/player/run'), img_dur = 6),
+                'jump': Animation(load_images('entities/player/jump')),
+            }
         }
 
-        self.sfx = {
-            'jump' : pygame.mixer.Sound('data/sfx/jump.wav'),
-            'attack' : pygame.mixer.Sound('data/sfx/attack.wav'),
-            'hit' : pygame.mixer.Sound('data/sfx/hit.wav'),
-            'death' : pygame.mixer.Sound('data/sfx/death.wav'),
-            'enemy_attack' : pygame.mixer.Sound('data/sfx/enemy_attack.wav')
-        }
-
-        self.sfx['jump'].set_volume(0.2)
-        self.sfx['attack'].set_volume(0.1)
-        self.sfx['hit'].set_volume(0.2)
-        self.sfx['death'].set_volume(0.2)
-        self.sfx['enemy_attack'].set_volume(0.2)
+        self.audio = Audio({'player': 3, 'enemy': 4, 'world': 3})
+        self.audio.load('jump', 'data/sfx/jump.wav', 'player', volume = 0.2)
+        self.audio.load('attack', 'data/sfx/attack.wav', 'player', volume = 0.1)
+        self.audio.load('hit', 'data/sfx/hit.wav', 'world', volume = 0.2)
+        self.audio.load('death', 'data/sfx/death.wav', 'world', volume = 0.2)
+        self.audio.load('enemy_attack', 'data/sfx/enemy_attack.wav', 'enemy', volume = 0.2, voices = 3)
 
-        self.clouds = Clouds(self.assets['clouds'], count = 8)
+        self.background = ParallaxLayer(self.assets['background'], depth = 0, size = self.display.get_size())
+        self.clouds = Clouds(self.assets['clouds'], count = 8, size = self.display.get_size())
 
         self.start_pos = (50, 50)
         self.player = Player(self, self.start_pos, (16, 16))
 
         self.tilemap = Tilemap(self, tile_size = 16)
 
-        self.level = 0
-        self.load_level(self.level)
-
         self.screenshake = 0
 
-        self.paused = False
-
-        self.attacks = []
-        self.projectiles = []
-        self.scroll = [0, 0]
+        self.level = 0
+        self.level_count = len(os.listdir('data/maps'))
+        self.load_level(self.level)
     
     def get_letterbox(self, surf):
         scale_x = self.native_size[0] / surf.get_width()
@@ -87,20 +106,29 @@ class Game:
 
 
     def load_level(self, map_id):
-        self.tilemap.load('data/maps/' + str(map_id) + '.json')
+        self.load_map('data/maps/' + str(map_id) + '.json')
+
+    def load_map(self, path):
+        self.tilemap.load(path)
+        self.navigation = Navigation(self.tilemap)
 
         self.enemies = []
+        self.activity = Activity()
         for spawner in self.tilemap.extract([('spawners', 0), ('spawners', 1)]):
             if spawner['variant'] == 0:
                 self.start_pos = spawner['pos']
                 self.player.pos = list(self.start_pos)
             else:
                 self.enemies.append(Enemy(self, spawner['pos'], (16, 16)))  
+                self.activity.add(self.enemies[-1])
 
         self.attacks = []
         self.projectiles = []
         self.scroll = [0, 0]
         self.transition = -30
+        self.visible = []
+
+        self.checkpoint = Snapshot(self)
 
     def pause_menu(self):
         font_button = pygame.font.Font(None, 24)
@@ -154,7 +182,7 @@ class Game:
             self.clock.tick(60)
 
 
-    def start_screen(self):
+    def start_screen(self, loader = None):
         font_button = pygame.font.Font(None, 24)
 
         start_screen = pygame.transform.scale(self.assets['start_screen'], self.display_2.get_size())
@@ -172,7 +200,11 @@ class Game:
             self.display.blit(txt, (rect.x + rect.width // 2 - txt.get_width() // 2, rect.y + rect.height // 2 - txt.get_height() // 2))
 
         waiting = True
-        while waiting:
+        # keep drawing and pumping events after Start until the background load is done
+        while waiting or (loader and loader.is_alive()):
+            if self.load_error:
+                raise self.load_error
+
             self.display.fill((0, 0, 0, 0))
             self.display_2.blit(start_screen, (0, 0))
 
@@ -180,7 +212,7 @@ class Game:
             scaled_mouse_pos = (mouse_pos[0] * self.display.get_width() // self.screen.get_width(),
                                 mouse_pos[1] * self.display.get_height() // self.screen.get_height())
 
-            draw_button(start_button, "Start", start_button.collidepoint(scaled_mouse_pos))
+            draw_button(start_button, "Start" if waiting else "Loading", start_button.collidepoint(scaled_mouse_pos))
             draw_button(exit_button, "Exit", exit_button.collidepoint(scaled_mouse_pos))
 
             self.display_2.blit(self.display, (0, 0))
@@ -198,18 +230,13 @@ class Game:
                     elif exit_button.collidepoint(scaled_mouse_pos):
                         pygame.quit()
                         sys.exit()
-        self.clock.tick(60)
-
 
-    def restart_level(self):
-        self.tilemap = Tilemap(self, tile_size = 16)
+            self.clock.tick(60)
 
-        self.attacks = []
-        self.projectiles = []
-        self.scroll = [0, 0]
-        self.enemies = []
 
-        self.load_level(self.level)
+    def restart_level(self):
+        self.checkpoint.restore(self)
+        self.visible = []
 
         self.player.air_time = 0
     
@@ -254,88 +281,107 @@ class Game:
                         sys.exit()
 
 
+    def die(self):
+        self.audio.play('death')
+        self.restart_level()
+        self.screenshake = max(16, self.screenshake)
+
+    def update(self, movement = (0, 0)):
+        self.screenshake = max(0, self.screenshake - 1)
+
+        if self.transition < 0:
+            self.transition += 1
+
+        self.scroll[0] += (self.player.rect().centerx - self.display.get_width() / 2 - self.scroll[0]) / 30
+        self.scroll[1] += (self.player.rect().centery - self.display.get_height() / 2 - self.scroll[1]) / 30
+        render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
+
+        self.clouds.update()
+
+        awake, self.visible = self.activity.update(render_scroll, self.display.get_size())
+        for enemy in awake:
+            enemy.update(self.tilemap, (0, 0))
+            self.activity.move(enemy)
+
+        self.player.update(self.tilemap, movement)
+        if self.player.air_time > 180:
+            self.die()
+            return False
+
+        for projectile in self.projectiles.copy():
+            projectile[0][0] += projectile[1]
+            projectile[2] += 1
+            if self.tilemap.solid_check(projectile[0]):
+                self.projectiles.remove(projectile)
+            elif projectile[2] > 90:
+                self.projectiles.remove(projectile)
+            elif self.player.rect().collidepoint(projectile[0]):
+                self.projectiles.remove(projectile)
+                self.die()
+                return False
+
+        for attack in self.attacks.copy():
+            attack[0][0] += attack[1]
+            attack[2] += 1
+            if self.tilemap.solid_check(attack[0]):
+                self.attacks.remove(attack)
+            elif attack[2] > 60:
+                self.attacks.remove(attack)
+            else:
+                for enemy in self.activity.near(attack[0]):
+                    if enemy.rect().collidepoint(attack[0]):
+                        self.audio.play('hit')
+                        self.screenshake = max(16, self.screenshake)
+                        self.enemies.remove(enemy)
+                        self.activity.remove(enemy)
+                        self.attacks.remove(attack)
+                        break
+        return True
+
     def run(self):
-        
-        pygame.mixer.music.load('data/music.wav')
-        pygame.mixer.music.set_volume(0.05)
-        pygame.mixer.music.play(-1)
-    
-        self.start_screen()
+        loader = threading.Thread(target = self.load_in_background, daemon = True)
+        loader.start()
+
+        self.start_screen(loader)
+        loader.join()
+        if self.load_error:
+            raise self.load_error
+
+        self.audio.play_music('data/music.wav', volume = 0.05)
 
         while True:
+            self.audio.update()
             self.display.fill((0, 0, 0, 0))
-            self.display_2.blit(self.assets['background'], (0, 0))
-
-            self.screenshake = max(0, self.screenshake - 1)
+            self.background.render(self.display_2)
 
             if not len(self.enemies):
                 self.transition += 1
                 if self.transition > 30:
-                    if self.level + 1 >= len(os.listdir('data/maps')):
+                    if self.level + 1 >= self.level_count:
                         self.congratulations_screen()
                         return
                     else:
                         self.level += 1
                         self.load_level(self.level)
 
-
-            if self.transition < 0:
-                self.transition += 1
-
-            self.scroll[0] += (self.player.rect().centerx - self.display.get_width() / 2 - self.scroll[0]) / 30
-            self.scroll[1] += (self.player.rect().centery - self.display.get_height() / 2 - self.scroll[1]) / 30
+            self.update((self.movement[1] - self.movement[0], 0))
             render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
 
-            self.clouds.update()
             self.clouds.render(self.display, offset = render_scroll)
             self.tilemap.render(self.display, offset = render_scroll)
 
-            for enemy in self.enemies.copy():
-                enemy.update(self.tilemap, (0, 0))
+            for enemy in self.visible:
                 enemy.render(self.display, offset=render_scroll)
 
-            self.player.update(self.tilemap, (self.movement[1] - self.movement[0], 0))
-            if self.player.air_time > 180:
-                self.sfx['death'].play()
-                self.screenshake = max(16, self.screenshake) 
-                self.restart_level()
-                continue
-
             self.player.render(self.display, offset = render_scroll)
 
-            for projectile in self.projectiles.copy():
-                projectile[0][0] += projectile[1]
-                projectile[2] += 1
+            for projectile in self.projectiles:
                 img = self.assets['projectile']
                 self.display.blit(img, (projectile[0][0] - img.get_width() / 2 - render_scroll[0], projectile[0][1] - img.get_height() / 2 - render_scroll[1]))
-                if self.tilemap.solid_check(projectile[0]):
-                    self.projectiles.remove(projectile)
-                elif projectile[2] > 90:
-                    self.projectiles.remove(projectile)
-                elif self.player.rect().collidepoint(projectile[0]):
-                    self.sfx['death'].play()
-                    self.projectiles.remove(projectile)
-                    self.screenshake = max(16, self.screenshake)
-                    self.restart_level()
-                    continue
-
-            for attack in self.attacks.copy():
-                attack[0][0] += attack[1]
-                attack[2] += 1
+
+            for attack in self.attacks:
                 img = self.assets['player/attack']
                 self.display.blit(img, (attack[0][0] - img.get_width() / 2 - render_scroll[0], attack[0][1] - img.get_height() / 2 - render_scroll[1]))
-                if self.tilemap.solid_check(attack[0]):
-                    self.attacks.remove(attack)
-                elif attack[2] > 60:
-                    self.attacks.remove(attack)
-                else:
-                    for enemy in self.enemies:
-                        if enemy.rect().collidepoint(attack[0]):
-                            self.sfx['hit'].play()
-                            self.screenshake = max(16, self.screenshake)
-                            self.enemies.remove(enemy)
-                            self.attacks.remove(attack)
-                            break
             
             display_mask = pygame.mask.from_surface(self.display)
             display_sillhoutte = display_mask.to_surface(setcolor = (0, 0, 0, 180), unsetcolor = (0, 0, 0, 0))
@@ -353,7 +399,7 @@ class Game:
                         self.movement[1] = True
                     if event.key == pygame.K_w:
                        if self.player.jump():
-                           self.sfx['jump'].play()
+                           self.audio.play('jump')
                     if event.key == pygame.K_SPACE:
                         self.player.attack()
                     if event.key == pygame.K_ESCAPE:
@@ -381,4 +427,8 @@ class Game:
             pygame.display.update()
             self.clock.tick(60)
 
-Game().run()
+def main():
+    Game().run()
+
+if __name__ == '__main__':
+    main()
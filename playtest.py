@@ -0,0 +1,219 @@
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+import traceback
+from multiprocessing import Pool
+
+from scripts.entities import Player, COLLIDE_LEFT, COLLIDE_RIGHT
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TILES_PATH = 'data/images/tiles/'
+
+game = None
+
+def tile_variants():
+    variants = {}
+    for tile_type in os.listdir(TILES_PATH):
+        variants[tile_type] = len(os.listdir(TILES_PATH + tile_type))
+    return variants
+
+def check_tile(tile, variants, where):
+    if not isinstance(tile, dict):
+        return [where + ': tile is not an object']
+    pos = tile.get('pos')
+    if not isinstance(pos, list) or len(pos) != 2 or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in pos):
+        return [where + ': invalid pos ' + repr(pos)]
+    if tile.get('type') not in variants:
+        return [where + ': unknown tile type ' + repr(tile.get('type'))]
+    if not isinstance(tile.get('variant'), int) or not 0 <= tile['variant'] < variants[tile['type']]:
+        return [where + ': invalid variant ' + repr(tile.get('variant')) + ' for ' + tile['type']]
+    return []
+
+def validate(path, variants):
+    try:
+        f = open(path, 'r')
+        map_data = json.load(f)
+        f.close()
+    except (OSError, ValueError) as e:
+        return ['unreadable: ' + str(e)]
+
+    if not isinstance(map_data, dict):
+        return ['map is not an object']
+    missing = [key for key in ('tilemap', 'tile_size', 'offgrid') if key not in map_data]
+    if missing:
+        return ['missing keys: ' + ', '.join(missing)]
+    if not isinstance(map_data['tilemap'], dict) or not isinstance(map_data['offgrid'], list):
+        return ['tilemap must be an object and offgrid a list']
+    if not isinstance(map_data['tile_size'], int) or isinstance(map_data['tile_size'], bool) or map_data['tile_size'] <= 0:
+        return ['invalid tile_size ' + repr(map_data['tile_size'])]
+
+    errors = []
+    spawners = {0: 0, 1: 0}
+    for loc, tile in map_data['tilemap'].items():
+        tile_errors = check_tile(tile, variants, loc)
+        errors += tile_errors
+        if tile_errors:
+            continue
+        if loc != str(tile['pos'][0]) + ';' + str(tile['pos'][1]):
+            errors.append(loc + ': key does not match pos ' + repr(tile['pos']))
+        if tile['type'] == 'spawners' and tile['variant'] in spawners:
+            spawners[tile['variant']] += 1
+    for i, tile in enumerate(map_data['offgrid']):
+        tile_errors = check_tile(tile, variants, 'offgrid ' + str(i))
+        errors += tile_errors
+        if not tile_errors and tile['type'] == 'spawners' and tile['variant'] in spawners:
+            spawners[tile['variant']] += 1
+
+    if spawners[0] != 1:
+        errors.append('expected 1 player spawner, found ' + str(spawners[0]))
+    if not spawners[1]:
+        errors.append('no enemy spawners')
+    return errors
+
+class RandomBot:
+    def __init__(self, rng):
+        self.rng = rng
+        self.direction = 0
+        self.hold = 0
+
+    def act(self, game):
+        if not self.hold:
+            self.direction = self.rng.choice((-1, 0, 1))
+            self.hold = self.rng.randint(10, 90)
+        self.hold -= 1
+        return self.direction, self.rng.random() < 0.02, self.rng.random() < 0.05
+
+class ScriptedBot:
+    def __init__(self, rng):
+        self.rng = rng
+        self.direction = 1
+
+    def act(self, game):
+        player = game.player
+        attack = False
+        if game.enemies:
+            target = min(game.enemies, key = lambda e: abs(e.pos[0] - player.pos[0]) + abs(e.pos[1] - player.pos[1]))
+            self.direction = 1 if target.pos[0] > player.pos[0] else -1
+            attack = game.navigation.can_see(player.rect().center, target.rect().center)
+
+        # jump over walls and off ledges, with a little noise so bots don't all take the same path
+        bounds = game.navigation.patrol_bounds(player.rect())
+        ahead = player.rect().centerx + self.direction * 8
+        blocked = player.collisions & (COLLIDE_LEFT | COLLIDE_RIGHT)
+        at_ledge = bounds and not bounds[0] <= ahead < bounds[1]
+        jump = blocked or (at_ledge and self.rng.random() < 0.5) or self.rng.random() < 0.005
+        return self.direction, jump, attack
+
+BOTS = {'random': RandomBot, 'scripted': ScriptedBot}
+
+def init_worker():
+    global game
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    # leave SIGTERM alone so the pool can shut its workers down
+    os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from game import Game
+    game = Game()
+    game.load()
+
+def playtest(path, bot, ticks):
+    game.player = Player(game, (0, 0), (16, 16))
+    game.load_map(path)
+
+    deaths = 0
+    reached = set()
+    frame_times = []
+    cleared = None
+    for tick in range(ticks):
+        direction, jump, attack = bot.act(game)
+        start = time.perf_counter()
+        if jump:
+            game.player.jump()
+        if attack:
+            game.player.attack()
+        if not game.update((direction, 0)):
+            deaths += 1
+        game.audio.update()
+        frame_times.append(time.perf_counter() - start)
+
+        segment = game.navigation.patrol_bounds(game.player.rect())
+        if segment:
+            reached.add(segment)
+        if not game.enemies:
+            cleared = tick
+            break
+    return deaths, reached, frame_times, cleared
+
+def check_map(job):
+    path, ticks, bots, bot_kind, seed = job
+    result = {'path': path, 'errors': []}
+    # a broken map must not take the rest of the batch down with it
+    try:
+        result['errors'] = validate(path, tile_variants())
+        if result['errors'] or not ticks:
+            return result
+
+        deaths = 0
+        reached = set()
+        frame_times = []
+        clears = []
+        for i in range(bots):
+            rng = random.Random(str(seed) + path + str(i))
+            random.seed(rng.random())
+            bot_deaths, bot_reached, bot_times, cleared = playtest(path, BOTS[bot_kind](rng), ticks)
+            deaths += bot_deaths
+            reached |= bot_reached
+            frame_times += bot_times
+            if cleared is not None:
+                clears.append(cleared)
+
+        result['segments'] = len(game.navigation.segments)
+        result['reached'] = len(reached)
+        result['deaths'] = deaths
+        result['clears'] = clears
+        result['mean_ms'] = sum(frame_times) / len(frame_times) * 1000
+        result['max_ms'] = max(frame_times) * 1000
+    except Exception:
+        result['errors'].append(traceback.format_exc().rstrip())
+    return result
+
+def report(result, bots):
+    if result['errors']:
+        return result['path'] + ': INVALID\n' + '\n'.join('    ' + line for error in result['errors'] for line in error.splitlines())
+    if 'segments' not in result:
+        return result['path'] + ': ok'
+    return (result['path'] + ': reached ' + str(result['reached']) + '/' + str(result['segments']) + ' platforms, '
+            + str(result['deaths']) + ' deaths, cleared ' + str(len(result['clears'])) + '/' + str(bots)
+            + ' runs, tick ' + format(result['mean_ms'], '.3f') + ' ms mean / ' + format(result['max_ms'], '.3f') + ' ms max')
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Validate and bot-playtest level maps.')
+    parser.add_argument('maps', nargs = '*', help = 'map files (default: data/maps/*.json)')
+    parser.add_argument('--ticks', type = int, default = 3600, help = 'ticks per bot run, 0 to only validate')
+    parser.add_argument('--bots', type = int, default = 4, help = 'bot runs per map')
+    parser.add_argument('--bot', choices = sorted(BOTS), default = 'scripted')
+    parser.add_argument('--workers', type = int, default = os.cpu_count())
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+
+    maps = [os.path.abspath(path) for path in args.maps] or sorted(glob.glob(os.path.join(ROOT, 'data/maps/*.json')))
+    jobs = [(path, args.ticks, args.bots, args.bot, args.seed) for path in maps]
+
+    invalid = 0
+    start = time.perf_counter()
+    with Pool(args.workers, initializer = init_worker) as pool:
+        for result in pool.imap_unordered(check_map, jobs):
+            print(report(result, args.bots))
+            invalid += bool(result['errors'])
+    print(str(len(maps)) + ' maps, ' + str(invalid) + ' invalid, ' + format(time.perf_counter() - start, '.1f') + ' s')
+    return 1 if invalid else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import pygame
+
+from scripts.entities import COLLIDE_DOWN
+
+class Activity:
+    def __init__(self, chunk_size = 128, render_margin = 32, wake_distance = 320):
+        self.chunk_size = chunk_size
+        self.render_margin = render_margin
+        self.wake_distance = wake_distance
+        self.chunks = {}
+        self.locations = {}
+        self.airborne = set()
+
+    def chunk_key(self, entity):
+        return (int(entity.pos[0] // self.chunk_size), int(entity.pos[1] // self.chunk_size))
+
+    def add(self, entity):
+        key = self.chunk_key(entity)
+        self.chunks.setdefault(key, []).append(entity)
+        self.locations[entity] = key
+        # nothing is known to be grounded until it has been simulated once
+        self.airborne.add(entity)
+
+    def remove(self, entity):
+        key = self.locations.pop(entity, None)
+        if key is not None:
+            self.chunks[key].remove(entity)
+            if not self.chunks[key]:
+                del self.chunks[key]
+        self.airborne.discard(entity)
+
+    def move(self, entity):
+        key = self.chunk_key(entity)
+        if key != self.locations[entity]:
+            self.remove(entity)
+            self.add(entity)
+        # entities that are not standing on anything keep simulating until they land
+        if entity.collisions & COLLIDE_DOWN:
+            self.airborne.discard(entity)
+        else:
+            self.airborne.add(entity)
+
+    def query(self, rect):
+        entities = []
+        for cx in range(rect.left // self.chunk_size, rect.right // self.chunk_size + 1):
+            for cy in range(rect.top // self.chunk_size, rect.bottom // self.chunk_size + 1):
+                if (cx, cy) in self.chunks:
+                    entities.extend(self.chunks[(cx, cy)])
+        return entities
+
+    def near(self, pos):
+        # anything no larger than a chunk that overlaps pos has its top-left within one chunk of it
+        return self.query(pygame.Rect(int(pos[0]) - self.chunk_size, int(pos[1]) - self.chunk_size, self.chunk_size, self.chunk_size))
+
+    def update(self, offset, size):
+        view = pygame.Rect(offset, size)
+        awake = self.query(view.inflate(self.wake_distance * 2, self.wake_distance * 2))
+        if self.airborne:
+            nearby = set(awake)
+            awake.extend(entity for entity in self.airborne if entity not in nearby)
+        render_area = view.inflate(self.render_margin * 2, self.render_margin * 2)
+        visible = [entity for entity in awake if render_area.colliderect(entity.rect())]
+        return awake, visible
@@ -0,0 +1,48 @@
+import pygame
+
+class Audio:
+    def __init__(self, pools):
+        total = sum(pools.values())
+        pygame.mixer.set_num_channels(total)
+        # reserve every channel so Sound.play() elsewhere can't steal from a pool
+        pygame.mixer.set_reserved(total)
+
+        self.pools = {}
+        channel_id = 0
+        for category, size in pools.items():
+            self.pools[category] = [pygame.mixer.Channel(channel_id + i) for i in range(size)]
+            channel_id += size
+
+        self.sounds = {}
+        self.played = set()
+
+    def load(self, name, path, category, volume = 1.0, voices = 2):
+        sound = pygame.mixer.Sound(path)
+        sound.set_volume(volume)
+        self.sounds[name] = (sound, category, voices)
+
+    def update(self):
+        self.played.clear()
+
+    def play(self, name):
+        # identical sounds triggered in the same tick are merged into one voice
+        if name in self.played:
+            return
+        self.played.add(name)
+
+        sound, category, voices = self.sounds[name]
+        free = None
+        playing = 0
+        for channel in self.pools[category]:
+            if not channel.get_busy():
+                if free is None:
+                    free = channel
+            elif channel.get_sound() == sound:
+                playing += 1
+        if free is not None and playing < voices:
+            free.play(sound)
+
+    def play_music(self, path, volume = 1.0, loops = -1):
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
@@ -1,32 +1,100 @@
+import math
 import random
 
-class Cloud:
-    def __init__(self, pos, img, speed, depth):
-        self.pos = list(pos)
-        self.img = img
+import pygame
+
+# below this many clouds a layer draws them one by one instead of blitting a full-screen strip
+COMPOSITE_CLOUDS = 48
+
+class ParallaxLayer:
+    def __init__(self, img, depth, speed = 0, size = (320, 240)):
+        self.depth = depth
         self.speed = speed
+        self.drift = 0
+
+        # repeat the image until it covers the target surface so a frame never needs more than two blits
+        columns = -(-size[0] // img.get_width())
+        rows = -(-size[1] // img.get_height())
+        self.size = (img.get_width() * columns, img.get_height() * rows)
+
+        # two copies side by side so any horizontal offset is one contiguous area
+        self.strip = pygame.Surface((self.size[0] * 2, self.size[1]))
+        self.strip.fill((0, 0, 0))
+        for x in range(columns * 2):
+            for y in range(rows):
+                self.strip.blit(img, (x * img.get_width(), y * img.get_height()))
+        self.strip.set_colorkey((0, 0, 0))
+
+    def update(self):
+        self.drift = (self.drift + self.speed) % self.size[0]
+
+    def render(self, surf, offset = (0, 0)):
+        x = math.floor(offset[0] * self.depth - self.drift) % self.size[0]
+        y = math.floor(offset[1] * self.depth) % self.size[1]
+        surf.blit(self.strip, (0, 0), (x, y, self.size[0], self.size[1] - y))
+        if y:
+            surf.blit(self.strip, (0, self.size[1] - y), (x, 0, self.size[0], y))
+
+class CloudLayer:
+    # few clouds: blitting each one beats a full-screen strip blit, so keep them as sprites
+    def __init__(self, clouds, tile_size, depth, speed = 0):
+        self.clouds = clouds
+        self.size = tile_size
         self.depth = depth
-    
+        self.speed = speed
+        self.drift = 0
+
     def update(self):
-        self.pos[0] += self.speed
-        
+        self.drift = (self.drift + self.speed) % self.size[0]
+
     def render(self, surf, offset = (0, 0)):
-        render_pos = (self.pos[0] - offset[0] * self.depth, self.pos[1] - offset[1] * self.depth)
-        surf.blit(self.img, (render_pos[0] % (surf.get_width() + self.img.get_width()) - self.img.get_width(), render_pos[1] % (surf.get_height() + self.img.get_height()) - self.img.get_height()))
-        
+        x = math.floor(offset[0] * self.depth - self.drift)
+        y = math.floor(offset[1] * self.depth)
+        for img, pos, img_size in self.clouds:
+            surf.blit(img, ((pos[0] - x) % self.size[0] - img_size[0], (pos[1] - y) % self.size[1] - img_size[1]))
+
 class Clouds:
-    def __init__(self, cloud_images, count = 8):
-        self.clouds = []
-        
+    def __init__(self, cloud_images, count = 8, layers = 4, size = (320, 240), seed = None):
+        if layers < 1:
+            raise ValueError('Clouds needs at least one layer')
+        self.layers = []
+        if not cloud_images or count < 1:
+            return
+
+        rng = random.Random(seed)
+        max_w = max(img.get_width() for img in cloud_images)
+        max_h = max(img.get_height() for img in cloud_images)
+        tile_size = (size[0] + max_w, size[1] + max_h)
+
+        layers = min(layers, count)
+        groups = [[] for i in range(layers)]
         for i in range(count):
-            self.clouds.append(Cloud((random.random() * 99999, random.random() * 99999), random.choice(cloud_images), random.random() * 0.05 + 0.05, random.random() * 0.6 + 0.2))
-        
-        self.clouds.sort(key=lambda x: x.depth)
-    
+            img = rng.choice(cloud_images)
+            pos = (rng.randrange(tile_size[0]), rng.randrange(tile_size[1]))
+            groups[rng.randrange(layers)].append((img, pos, img.get_size()))
+
+        for i, clouds in enumerate(groups):
+            if not clouds:
+                continue
+            depth = 0.2 + 0.6 * (i + 0.5) / layers
+            speed = rng.random() * 0.05 + 0.05
+            if len(clouds) < COMPOSITE_CLOUDS:
+                self.layers.append(CloudLayer(clouds, tile_size, depth, speed))
+                continue
+
+            tile = pygame.Surface(tile_size)
+            for img, pos, img_size in clouds:
+                # stamp wrapped copies so the tile repeats seamlessly
+                for dx in (0, -tile_size[0]):
+                    for dy in (0, -tile_size[1]):
+                        tile.blit(img, (pos[0] - img_size[0] + dx, pos[1] - img_size[1] + dy))
+            tile.set_colorkey((0, 0, 0))
+            self.layers.append(ParallaxLayer(tile, depth, speed, size))
+
     def update(self):
-        for cloud in self.clouds:
-            cloud.update()
-    
+        for layer in self.layers:
+            layer.update()
+
     def render(self, surf, offset = (0, 0)):
-        for cloud in self.clouds:
-            cloud.render(surf, offset = offset)
\ No newline at end of file
+        for layer in self.layers:
+            layer.render(surf, offset = offset)
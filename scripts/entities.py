@@ -2,17 +2,26 @@ import pygame
 
 import random
 
+COLLIDE_UP = 1
+COLLIDE_DOWN = 2
+COLLIDE_RIGHT = 4
+COLLIDE_LEFT = 8
+
 class PhysicsEntity:
+    __slots__ = ('game', 'type', 'pos', 'size', 'velocity', 'collisions', 'action', 'animation', 'frame', 'flip')
+
+    anim_offset = (-1, -1)
+
     def __init__(self, game, e_type, pos, size):
         self.game = game
         self.type = e_type
         self.pos = list(pos)
         self.size = size
         self.velocity = [0, 0]
-        self.collisions = {'up': False, 'down': False, 'right': False, 'left': False}
+        self.collisions = 0
         
         self.action = ''
-        self.anim_offset = (-1, -1)
+        self.frame = 0
         self.flip = False
         self.set_action('idle')
     
@@ -22,10 +31,11 @@ class PhysicsEntity:
     def set_action(self, action):
         if action != self.action:
             self.action = action
-            self.animation = self.game.assets[self.type + '/' + self.action].copy()
+            self.animation = self.game.clips[self.type][action]
+            self.frame = 0
         
     def update(self, tilemap, movement = (0, 0)):
-        self.collisions = {'up': False, 'down': False, 'right': False, 'left': False}
+        self.collisions = 0
         
         frame_movement = (movement[0] + self.velocity[0], movement[1] + self.velocity[1])
         
@@ -35,10 +45,10 @@ class PhysicsEntity:
             if entity_rect.colliderect(rect):
                 if frame_movement[0] > 0:
                     entity_rect.right = rect.left
-                    self.collisions['right'] = True
+                    self.collisions |= COLLIDE_RIGHT
                 if frame_movement[0] < 0:
                     entity_rect.left = rect.right
-                    self.collisions['left'] = True
+                    self.collisions |= COLLIDE_LEFT
                 self.pos[0] = entity_rect.x
         
         self.pos[1] += frame_movement[1]
@@ -47,10 +57,10 @@ class PhysicsEntity:
             if entity_rect.colliderect(rect):
                 if frame_movement[1] > 0:
                     entity_rect.bottom = rect.top
-                    self.collisions['down'] = True
+                    self.collisions |= COLLIDE_DOWN
                 if frame_movement[1] < 0:
                     entity_rect.top = rect.bottom
-                    self.collisions['up'] = True
+                    self.collisions |= COLLIDE_UP
                 self.pos[1] = entity_rect.y
                 
         if movement[0] > 0:
@@ -60,24 +70,34 @@ class PhysicsEntity:
         
         self.velocity[1] = min(5, self.velocity[1] + 0.1)
         
-        if self.collisions['down'] or self.collisions['up']:
+        if self.collisions & (COLLIDE_DOWN | COLLIDE_UP):
             self.velocity[1] = 0
             
-        self.animation.update()
+        self.frame = self.animation.update(self.frame)
         
     def render(self, surf, offset=(0, 0)):
-        surf.blit(pygame.transform.flip(self.animation.img(), self.flip, False), (self.pos[0] - offset[0] + self.anim_offset[0], self.pos[1] - offset[1] + self.anim_offset[1]))
+        surf.blit(pygame.transform.flip(self.animation.img(self.frame), self.flip, False), (self.pos[0] - offset[0] + self.anim_offset[0], self.pos[1] - offset[1] + self.anim_offset[1]))
 
 class Enemy(PhysicsEntity):
+    __slots__ = ('walking', 'idle')
+
     def __init__(self, game, pos, size):
         super().__init__(game, 'enemy', pos, size)
         
         self.walking = 0
+        self.idle = self.idle_time()
+
+    def idle_time(self):
+        # same spread as rolling a 1% chance every frame, drawn once per idle period
+        return int(random.expovariate(0.01))
     
     def update(self, tilemap, movement = (0, 0)):
+        navigation = self.game.navigation
         if self.walking:
-            if tilemap.solid_check((self.rect().centerx + (-7 if self.flip else 7), self.pos[1] + 23)):
-                if (self.collisions['right'] or self.collisions['left']):
+            bounds = navigation.patrol_bounds(self.rect())
+            ahead = self.rect().centerx + (-7 if self.flip else 7)
+            if bounds and bounds[0] <= ahead < bounds[1]:
+                if self.collisions & (COLLIDE_RIGHT | COLLIDE_LEFT):
                     self.flip = not self.flip
                 else:
                     movement = (movement[0] - 0.5 if self.flip else 0.5, movement[1])
@@ -85,15 +105,18 @@ class Enemy(PhysicsEntity):
                 self.flip = not self.flip
             self.walking = max(0, self.walking - 1)
             if not self.walking:
-                dis = (self.game.player.pos[0] - self.pos[0], self.game.player.pos[1] - self.pos[1])
-                if(abs(dis[1]) < 16):
-                    if (self.flip and dis[0] < 0):
+                self.idle = self.idle_time()
+                target = self.game.player.rect().center
+                if navigation.can_see(self.rect().center, target):
+                    if (self.flip and target[0] < self.rect().centerx):
                         self.game.projectiles.append([[self.rect().centerx - 7, self.rect().centery], -1.5, 0])
-                        self.game.sfx['enemy_attack'].play()
-                    if (not self.flip and dis[0] > 0):
+                        self.game.audio.play('enemy_attack')
+                    if (not self.flip and target[0] > self.rect().centerx):
                         self.game.projectiles.append([[self.rect().centerx + 7, self.rect().centery], 1.5, 0])
-                        self.game.sfx['enemy_attack'].play() 
-        elif random.random() < 0.01:
+                        self.game.audio.play('enemy_attack') 
+        elif self.idle:
+            self.idle -= 1
+        else:
             self.walking = random.randint(30, 120)
 
         super().update(tilemap, movement = movement)
@@ -104,6 +127,8 @@ class Enemy(PhysicsEntity):
             self.set_action('idle')
 
 class Player(PhysicsEntity):
+    __slots__ = ('air_time', 'jumps', 'attack_cooldown')
+
     def __init__(self, game, pos, size):
         super().__init__(game, 'player', pos, size)
         
@@ -117,7 +142,7 @@ class Player(PhysicsEntity):
         
         self.air_time += 1
 
-        if self.collisions['down']:
+        if self.collisions & COLLIDE_DOWN:
             self.air_time = 0
             self.jumps = 2
 
@@ -143,10 +168,10 @@ class Player(PhysicsEntity):
         if self.attack_cooldown == 0:
             if (self.flip):
                 self.game.attacks.append([[self.rect().centerx - 7, self.rect().centery], -1.5, 0])
-                self.game.sfx['attack'].play()
+                self.game.audio.play('attack')
             if (not self.flip):
                 self.game.attacks.append([[self.rect().centerx + 7, self.rect().centery], 1.5, 0])
-                self.game.sfx['attack'].play()
+                self.game.audio.play('attack')
 
             self.attack_cooldown = 60
       
\ No newline at end of file
@@ -0,0 +1,66 @@
+from scripts.tilemap import PHYSICS_TILES
+
+class Navigation:
+    def __init__(self, tilemap):
+        self.tile_size = tilemap.tile_size
+        self.platforms = {}
+        self.segments = []
+        self.sight = {}
+
+        solid = set()
+        for tile in tilemap.tilemap.values():
+            if tile['type'] in PHYSICS_TILES:
+                solid.add((int(tile['pos'][0]), int(tile['pos'][1])))
+
+        self.build_platforms(solid)
+        self.build_sight(solid)
+
+    def build_platforms(self, solid):
+        # walkable tiles are solid tiles with open space above, merged into horizontal runs
+        walkable = sorted((y, x) for x, y in solid if (x, y - 1) not in solid)
+        run = []
+        for y, x in walkable:
+            if run and (run[-1][0] != y or run[-1][1] != x - 1):
+                self.add_segment(run)
+                run = []
+            run.append((y, x))
+        if run:
+            self.add_segment(run)
+
+    def add_segment(self, run):
+        y = run[0][0]
+        segment = (run[0][1] * self.tile_size, (run[-1][1] + 1) * self.tile_size, y * self.tile_size)
+        self.segments.append(segment)
+        for _, x in run:
+            self.platforms[str(x) + ';' + str(y)] = segment
+
+    def build_sight(self, solid):
+        # open spans between walls on every row an entity can stand in
+        if not solid:
+            return
+        min_x = min(x for x, _ in solid)
+        max_x = max(x for x, _ in solid)
+        rows = {y - 1 for x, y in solid if (x, y - 1) not in solid}
+        for row in rows:
+            start = min_x
+            for x in range(min_x, max_x + 2):
+                if x > max_x or (x, row) in solid:
+                    span = (start * self.tile_size if start > min_x else float('-inf'),
+                            x * self.tile_size if x <= max_x else float('inf'))
+                    for sx in range(start, x):
+                        self.sight[str(sx) + ';' + str(row)] = span
+                    start = x + 1
+
+    def platform_at(self, pos):
+        return self.platforms.get(str(int(pos[0] // self.tile_size)) + ';' + str(int(pos[1] // self.tile_size)))
+
+    def patrol_bounds(self, rect):
+        return self.platform_at((rect.centerx, rect.bottom + 7))
+
+    def can_see(self, pos, target):
+        if abs(target[1] - pos[1]) >= self.tile_size:
+            return False
+        span = self.sight.get(str(int(pos[0] // self.tile_size)) + ';' + str(int(pos[1] // self.tile_size)))
+        if not span:
+            return False
+        return span[0] <= target[0] < span[1]
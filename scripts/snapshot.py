@@ -0,0 +1,89 @@
+import struct
+
+from scripts.entities import Enemy
+from scripts.activity import Activity
+
+HEADER = struct.Struct('<Hi2dHHH')
+ENTITY = struct.Struct('<4d2H?BBH')
+PLAYER = struct.Struct('<iBH')
+ENEMY = struct.Struct('<HI')
+SHOT = struct.Struct('<3dH')
+
+def pack_entity(entity, actions):
+    # action names go in a per-snapshot table so new actions need no format change
+    if entity.action not in actions:
+        actions[entity.action] = len(actions)
+    return ENTITY.pack(entity.pos[0], entity.pos[1], entity.velocity[0], entity.velocity[1], entity.size[0], entity.size[1],
+                       entity.flip, actions[entity.action], entity.collisions, entity.frame)
+
+def unpack_entity(entity, data, offset, actions):
+    x, y, vx, vy, w, h, flip, action, collisions, frame = ENTITY.unpack_from(data, offset)
+    entity.pos = [x, y]
+    entity.velocity = [vx, vy]
+    entity.size = (w, h)
+    entity.flip = flip
+    entity.set_action(actions[action])
+    entity.frame = frame
+    entity.collisions = collisions
+    return offset + ENTITY.size
+
+class Snapshot:
+    def __init__(self, game):
+        # tile data is never mutated once a level is loaded (Tilemap.load swaps in new
+        # containers), so snapshots share it instead of copying
+        self.tilemap = game.tilemap
+        self.tiles = game.tilemap.tilemap
+        self.offgrid = game.tilemap.offgrid_tiles
+        self.tile_size = game.tilemap.tile_size
+        self.navigation = game.navigation
+
+        player = game.player
+        actions = {}
+        parts = [HEADER.pack(game.level, game.transition, game.scroll[0], game.scroll[1],
+                             len(game.enemies), len(game.projectiles), len(game.attacks)),
+                 pack_entity(player, actions),
+                 PLAYER.pack(player.air_time, player.jumps, player.attack_cooldown)]
+        for enemy in game.enemies:
+            parts.append(pack_entity(enemy, actions))
+            parts.append(ENEMY.pack(enemy.walking, enemy.idle))
+        for shot in game.projectiles + game.attacks:
+            parts.append(SHOT.pack(shot[0][0], shot[0][1], shot[1], shot[2]))
+        self.data = b''.join(parts)
+        self.actions = tuple(actions)
+
+    def restore(self, game):
+        data = self.data
+        game.level, game.transition, sx, sy, enemies, projectiles, attacks = HEADER.unpack_from(data, 0)
+        game.scroll = [sx, sy]
+        offset = HEADER.size
+
+        game.tilemap = self.tilemap
+        game.tilemap.tilemap = self.tiles
+        game.tilemap.offgrid_tiles = self.offgrid
+        game.tilemap.tile_size = self.tile_size
+        game.navigation = self.navigation
+
+        player = game.player
+        offset = unpack_entity(player, data, offset, self.actions)
+        player.air_time, player.jumps, player.attack_cooldown = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+
+        game.enemies = []
+        game.activity = Activity()
+        for i in range(enemies):
+            w, h = ENTITY.unpack_from(data, offset)[4:6]
+            enemy = Enemy(game, (0, 0), (w, h))
+            offset = unpack_entity(enemy, data, offset, self.actions)
+            enemy.walking, enemy.idle = ENEMY.unpack_from(data, offset)
+            offset += ENEMY.size
+            game.enemies.append(enemy)
+            game.activity.add(enemy)
+            game.activity.move(enemy)
+
+        shots = []
+        for i in range(projectiles + attacks):
+            x, y, speed, timer = SHOT.unpack_from(data, offset)
+            shots.append([[x, y], speed, timer])
+            offset += SHOT.size
+        game.projectiles = shots[:projectiles]
+        game.attacks = shots[projectiles:]
@@ -16,23 +16,20 @@ def load_images(path):
     return images
 
 class Animation:
+    # shared, read-only clip; the current frame lives on the entity playing it
+    __slots__ = ('images', 'img_duration', 'loop', 'length')
+
     def __init__(self, images, img_dur = 5, loop = True):
-        self.images = images
+        self.images = tuple(images)
         self.loop = loop
         self.img_duration = img_dur
-        self.done = False
-        self.frame = 0
-    
-    def copy(self):
-        return Animation(self.images, self.img_duration, self.loop)
+        self.length = img_dur * len(self.images)
     
-    def update(self):
+    def update(self, frame):
         if self.loop:
-            self.frame = (self.frame + 1) % (self.img_duration * len(self.images))
-        else:
-            self.frame = min(self.frame + 1, self.img_duration * len(self.images) - 1)
-            if self.frame >= self.img_duration * len(self.images) - 1:
-                self.done = True
+            return (frame + 1) % self.length
+        return min(frame + 1, self.length - 1)
+
     
-    def img(self):
-        return self.images[int(self.frame / self.img_duration)]
\ No newline at end of file
+    def img(self, frame):
+        return self.images[int(frame / self.img_duration)]